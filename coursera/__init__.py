@@ -3,4 +3,4 @@
 API_ROOT = "https://api.coursera.org/api"
 ACCOUNT_ROOT = "https://accounts.coursera.org/oauth2/v1"
 
-from .client import Coursera
+from .client import Coursera, get_client
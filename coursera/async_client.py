@@ -0,0 +1,187 @@
+"""Async Coursera API client backed by httpx."""
+
+import os
+import asyncio
+import logging
+
+import httpx
+
+from . import API_ROOT, ACCOUNT_ROOT
+from .credentials import Credentials
+from .models import User, LabImage, Lab, ItemReference
+
+
+class AsyncRefresherAuth(httpx.Auth):
+    """httpx auth flow mirroring RefresherAuth for the async client.
+
+    Fetches a bearer token from the refresh token on first use and, if a
+    request comes back 401, refreshes and replays it once.
+    """
+
+    # The token response body must be read inside the auth flow.
+    requires_response_body = True
+
+    def __init__(self, creds):
+        self.creds = creds
+        self.access_token = None
+        # Serializes token fetches so a cold asyncio.gather fan-out (or an
+        # N-way 401 after mid-run expiry) collapses to a single refresh.
+        self._refresh_lock = asyncio.Lock()
+
+    def _token_request(self):
+        return httpx.Request(
+            "POST",
+            ACCOUNT_ROOT + "/token",
+            data={
+                "refresh_token": self.creds.refresh_token,
+                "grant_type": "refresh_token",
+                "client_id": self.creds.client_id,
+                "client_secret": self.creds.client_secret,
+                "redirect_uri": "http://localhost:9876/callback",
+            },
+        )
+
+    def _store_token(self, resp):
+        if resp.status_code != 200:
+            raise RuntimeError(
+                "Unable to get a access token based on the supplied refresh token: [{}] {}".format(
+                    resp.status_code, resp.json()["msg"]
+                )
+            )
+
+        self.access_token = resp.json()["access_token"]
+
+    def auth_flow(self, request):
+        if not self.access_token:
+            self._store_token((yield self._token_request()))
+
+        request.headers["Authorization"] = "Bearer {}".format(self.access_token)
+        response = yield request
+
+        if response.status_code == 401:
+            logging.info("Received a 401. Refreshing the access token and retrying.")
+            self._store_token((yield self._token_request()))
+            request.headers["Authorization"] = "Bearer {}".format(self.access_token)
+            yield request
+
+    async def async_auth_flow(self, request):
+        if not self.access_token:
+            async with self._refresh_lock:
+                # Another coroutine may have refreshed while we waited.
+                if not self.access_token:
+                    self._store_token((yield self._token_request()))
+
+        token = self.access_token
+        request.headers["Authorization"] = "Bearer {}".format(token)
+        response = yield request
+
+        if response.status_code == 401:
+            async with self._refresh_lock:
+                # Only refresh if nobody else already replaced the token
+                # that just failed.
+                if self.access_token == token:
+                    logging.info(
+                        "Received a 401. Refreshing the access token and retrying."
+                    )
+                    self._store_token((yield self._token_request()))
+
+            request.headers["Authorization"] = "Bearer {}".format(self.access_token)
+            yield request
+
+
+class AsyncCoursera:
+    """Async Coursera API client.
+
+    Multiplexes concurrent requests over a single HTTP/2 connection, so an
+    entire course tree can be fetched with asyncio.gather without paying a
+    handshake or a serial round-trip per call. Requires a refresh token;
+    the browser-based OAuth flow is only available on the sync client.
+    """
+
+    def __init__(self):
+        creds = Credentials(
+            client_id=os.environ.get("COURSERA_CLIENT_ID"),
+            client_secret=os.environ.get("COURSERA_CLIENT_SECRET"),
+            refresh_token=os.environ.get("COURSERA_REFRESH_TOKEN"),
+            scopes=os.environ.get(
+                "COURSERA_SCOPES", "view_profile access_course_authoring_api"
+            ),
+        )
+
+        if not creds.refresh_token:
+            raise ValueError("AsyncCoursera requires COURSERA_REFRESH_TOKEN to be set.")
+
+        self._client = httpx.AsyncClient(
+            http2=True,
+            base_url=API_ROOT,
+            auth=AsyncRefresherAuth(creds),
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+            timeout=30.0,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the underlying connection pool."""
+
+        await self._client.aclose()
+
+    async def whoami(self) -> User:
+        """Get your user profile."""
+
+        return User(
+            **(
+                await self.__request(
+                    "GET",
+                    "/externalBasicProfiles.v1",
+                    params={"q": "me", "fields": "name,timezone,locale,privacy"},
+                )
+            )[0]
+        )
+
+    async def get_images(self, course_id) -> [LabImage]:
+        """Get a list of images for a course."""
+
+        resp = await self.__request("GET", f"/v1/courses/{course_id}/labImages")
+
+        return [LabImage(id=x["id"], **x["labImage"]) for x in resp]
+
+    async def get_labs(self, course_id, image_id) -> [Lab]:
+        """Get a list of labs using an image for a course."""
+
+        resp = await self.__request(
+            "GET", f"/v1/courses/{course_id}/labImages/{image_id}/labs"
+        )
+
+        return [Lab(id=x["id"], **x["lab"]) for x in resp]
+
+    async def get_lab_items(self, course_id, image_id, lab_id) -> [ItemReference]:
+        """Get a list of items using a lab."""
+
+        resp = await self.__request(
+            "GET",
+            f"/v1/courses/{course_id}/labImages/{image_id}/labs/{lab_id}/itemsUsingLab",
+        )
+
+        return [ItemReference.model_construct(**x) for x in resp]
+
+    async def __request(self, method, path, **kwargs):
+        """Send a request with Coursera auth headers."""
+
+        logging.debug("[%s] %s", method, path)
+        resp = await self._client.request(method, path, **kwargs)
+
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError:
+            logging.error(
+                "Received a bad response from Coursera: %s",
+                resp.content.decode("utf-8"),
+            )
+            return []
+
+        return resp.json()["elements"]
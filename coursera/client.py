@@ -1,9 +1,23 @@
 """Coursera API Client."""
 
 import os
+import time
 import logging
+from typing import Iterator
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
+
+import ijson
 import requests
 
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from coursera_autograder.commands import oauth2
 
 from . import API_ROOT
@@ -12,25 +26,56 @@ from .refresher_auth import RefresherAuth
 from .models import User, LabImage, Lab, ItemReference
 
 
+# Allowed parameter sets for the endpoints that accept a body, built once at
+# import time so each call is a single C-level set difference.
+_ASSET_KEYS = frozenset(
+    {
+        "filename",
+        "url",
+        "type",
+        "languageCode",
+        "videoTemplate",
+        "runAsync",
+        "callbackUrl",
+        "callbackUrlToken",
+    }
+)
+_LAB_KEYS = frozenset({"name", "description"})
+_MOUNT_KEYS = frozenset({"mountPath", "type", "newMountPath", "volumeArchiveAssetId"})
+_UNMOUNT_KEYS = frozenset({"mountPath"})
+_PUBLISH_KEYS = frozenset({"publishType", "publishSummary"})
+
+
 def filter_params(params, keys):
     """Raise if the params include extra invalid keys."""
 
-    for key in params.keys():
-        if key not in keys:
-            raise ValueError(
-                "{} is not a valid parameter for this function.".format(key)
-            )
+    extra = params.keys() - keys
+    if extra:
+        raise ValueError(
+            "{} is not a valid parameter for this function.".format(next(iter(extra)))
+        )
 
 
 class UnsupportedError(Exception):
     """This method is not currently supported, but is expected to be in the future."""
 
 
+class BaseUrlSession(requests.Session):
+    """Session that resolves relative paths against a fixed base URL."""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def request(self, method, url, *args, **kwargs):
+        return super().request(method, self.base_url + url, *args, **kwargs)
+
+
 class Coursera:
     """Coursera API client."""
 
     def __init__(self):
-        creds = Credentials(
+        self._creds = Credentials(
             client_id=os.environ.get("COURSERA_CLIENT_ID"),
             client_secret=os.environ.get("COURSERA_CLIENT_SECRET"),
             refresh_token=os.environ.get("COURSERA_REFRESH_TOKEN"),
@@ -39,15 +84,50 @@ class Coursera:
             ),
         )
 
-        if creds.refresh_token:
+        self.session = BaseUrlSession(API_ROOT)
+
+        # The API speaks JSON everywhere, so set the content headers once on
+        # the session instead of patching them per call. Accept-Encoding opts
+        # into compressed bodies, which requests decompresses transparently.
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+            }
+        )
+
+        # Keep a pool of warm connections to api.coursera.org and let urllib3
+        # retry transient failures instead of surfacing them immediately.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Short-lived cache of GET responses, keyed on (path, params), so
+        # scripts that re-walk the same course don't refetch identical lists.
+        self._cache = {}
+        self._cache_ttl = 30.0
+
+    @cached_property
+    def auth(self):
+        """Build the authorizer on first use.
+
+        The OAuth server flow can spin up a local server and block on browser
+        interaction, so don't pay for it unless a request is actually sent.
+        """
+
+        if self._creds.refresh_token:
             logging.info("Refresh token detected. Using CourseraRefresherAuth.")
-            auth = RefresherAuth(creds)
-        else:
-            logging.info("Refresh token not detected. Using Coursera's OAuth server.")
-            auth = oauth2.build_oauth2(creds).build_authorizer()
+            return RefresherAuth(self._creds)
 
-        self.session = requests.Session()
-        self.session.auth = auth
+        logging.info("Refresh token not detected. Using Coursera's OAuth server.")
+        return oauth2.build_oauth2(self._creds).build_authorizer()
 
     def whoami(self) -> User:
         """Get your user profile."""
@@ -57,6 +137,8 @@ class Coursera:
                 "GET",
                 "/externalBasicProfiles.v1",
                 params={"q": "me", "fields": "name,timezone,locale,privacy"},
+                # Profiles effectively never change mid-run.
+                ttl=4 * 3600.0,
             )[0]
         )
 
@@ -66,21 +148,9 @@ class Coursera:
         if not params:
             params = {}
 
-        filter_params(
-            params,
-            [
-                "filename",
-                "url",
-                "type",
-                "languageCode",
-                "videoTemplate",
-                "runAsync",
-                "callbackUrl",
-                "callbackUrlToken",
-            ],
-        )
+        filter_params(params, _ASSET_KEYS)
 
-        return self.__request("POST", f"/v1/courses/{course_id}/assets", body=params)
+        return self.__request("POST", f"/v1/courses/{course_id}/assets", json=params)
 
     def get_asset(self, course_id, asset_id):
         """Get an asset for a course."""
@@ -111,18 +181,31 @@ class Coursera:
 
         return [Lab(id=x["id"], **x["lab"]) for x in resp]
 
+    def get_labs_bulk(self, course_id, image_ids) -> [[Lab]]:
+        """Get the labs for several images concurrently.
+
+        Returns one list of labs per image id, in input order. The calls are
+        independent GETs to the same host, so fanning them out over the
+        session's connection pool overlaps their round-trip latency.
+        """
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(
+                executor.map(lambda image_id: self.get_labs(course_id, image_id), image_ids)
+            )
+
     def update_lab(self, course_id, image_id, lab_id, params=None):
         """Update the details of a lab."""
 
         if not params:
             params = {}
 
-        filter_params(params, ["name", "description"])
+        filter_params(params, _LAB_KEYS)
 
         return self.__request(
             "UPDATE",
             f"/v1/courses/{course_id}/labImages/{image_id}/labs/{lab_id}",
-            body=params,
+            json=params,
         )
 
     def get_lab_items(self, course_id, image_id, lab_id) -> [ItemReference]:
@@ -133,9 +216,41 @@ class Coursera:
             f"/v1/courses/{course_id}/labImages/{image_id}/labs/{lab_id}/itemsUsingLab",
         )
 
-        if resp:
-            print(resp[0])
-        return [ItemReference(**x) for x in resp]
+        logging.debug("get_lab_items first element: %r", resp[0] if resp else None)
+
+        # The API already returns exactly the declared fields, so skip
+        # pydantic validation when wrapping potentially hundreds of items.
+        return [ItemReference.model_construct(**x) for x in resp]
+
+    def iter_lab_items(self, course_id, image_id, lab_id) -> Iterator[ItemReference]:
+        """Stream the items using a lab without buffering the whole response.
+
+        Unlike get_lab_items, this parses the response incrementally, so peak
+        memory stays proportional to a single item rather than the full
+        payload. Results are not cached.
+        """
+
+        if self.session.auth is None:
+            self.session.auth = self.auth
+
+        path = f"/v1/courses/{course_id}/labImages/{image_id}/labs/{lab_id}/itemsUsingLab"
+
+        with self.session.get(path, stream=True) as resp:
+            resp.raise_for_status()
+            # Let urllib3 decompress the stream before ijson sees it.
+            resp.raw.decode_content = True
+            for obj in ijson.items(resp.raw, "elements.item"):
+                yield ItemReference.model_construct(**obj)
+
+    def get_lab_items_bulk(self, keys) -> [[ItemReference]]:
+        """Get the items for several labs concurrently.
+
+        ``keys`` is an iterable of (course_id, image_id, lab_id) tuples;
+        returns one list of item references per key, in input order.
+        """
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(executor.map(lambda key: self.get_lab_items(*key), keys))
 
     def create_mount_point(self, course_id, image_id, lab_id, params=None):
         """Create or update a mount point for a lab."""
@@ -143,14 +258,12 @@ class Coursera:
         if not params:
             params = {}
 
-        filter_params(
-            params, ["mountPath", "type", "newMountPath", "volumeArchiveAssetId"]
-        )
+        filter_params(params, _MOUNT_KEYS)
 
         return self.__request(
             "POST",
             f"/v1/courses/{course_id}/labImages/{image_id}/labs",
-            body=params,
+            json=params,
             params={"action": "createOrPatchMountPoint", "labId": lab_id},
         )
 
@@ -160,12 +273,12 @@ class Coursera:
         if not params:
             params = {}
 
-        filter_params(params, ["mountPath"])
+        filter_params(params, _UNMOUNT_KEYS)
 
         return self.__request(
             "POST",
             f"/v1/courses/{course_id}/labImages/{image_id}/labs",
-            body=params,
+            json=params,
             params={"action": "deleteMountPoint", "labId": lab_id},
         )
 
@@ -175,29 +288,44 @@ class Coursera:
         if not params:
             params = {}
 
-        filter_params(params, ["publishType", "publishSummary"])
+        filter_params(params, _PUBLISH_KEYS)
 
         return self.__request(
             "POST",
             f"/v1/courses/{course_id}/labImages/{image_id}/labs",
-            body=params,
+            json=params,
             params={"action": "asyncPublish", "labId": lab_id},
         )
 
-    def __request(self, method, path, *args, **kwargs):
+    def __request(self, method, path, *args, ttl=None, **kwargs):
         """Send a request with Coursera auth headers."""
 
-        # Prefix all relative paths with the API_ROOT
-        path = API_ROOT + path
+        if method == "GET":
+            key = (path, tuple(sorted((kwargs.get("params") or {}).items())))
+            cached = self._cache.get(key)
+            if cached and time.monotonic() < cached[0]:
+                logging.debug("[%s] %s (cached)", method, path)
+                return cached[1]
+        else:
+            # A write under a course invalidates anything cached for it.
+            prefix = "/".join(path.split("/", 4)[:4])
+            for stale in [k for k in self._cache if k[0].startswith(prefix)]:
+                del self._cache[stale]
 
-        # If we're submitting a body, it needs the application/json header.
-        if "body" in kwargs:
-            kwargs["headers"]["Content-Type"] = "application/json"
+        if self.session.auth is None:
+            self.session.auth = self.auth
 
         # Send the request!
         logging.debug("[%s] %s ? %s", method, path, args)
         resp = self.session.request(method, path, *args, **kwargs)
 
+        # A 401 means the token lapsed anyway; drop it so the auth hook
+        # fetches a fresh one, and retry the request a single time.
+        if resp.status_code == 401 and isinstance(self.session.auth, RefresherAuth):
+            logging.info("Received a 401. Refreshing the access token and retrying.")
+            self.session.auth.invalidate()
+            resp = self.session.request(method, path, *args, **kwargs)
+
         # TODO: Try to figure out how to more intelligently deal with this.
         # Sometimes I get a strange 400 error that suggests that it's a bad request,
         # but the details sound like it's an infra problem on Coursera's side:
@@ -224,4 +352,30 @@ class Coursera:
             )
             return []
 
-        return resp.json()["elements"]
+        # Parse the raw bytes directly; orjson skips the UTF-8 decode to str
+        # that resp.json() would pay and is considerably faster to boot.
+        elements = _json.loads(resp.content)["elements"]
+
+        if method == "GET":
+            expires = time.monotonic() + (self._cache_ttl if ttl is None else ttl)
+            self._cache[key] = (expires, elements)
+
+        return elements
+
+
+_DEFAULT_CLIENT = None
+
+
+def get_client() -> Coursera:
+    """Get a shared Coursera client, constructing it on first use.
+
+    Reusing one client shares its connection pool, auth, and response cache
+    across every caller in the process.
+    """
+
+    global _DEFAULT_CLIENT
+
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = Coursera()
+
+    return _DEFAULT_CLIENT
@@ -1,10 +1,9 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Model(BaseModel):
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class User(Model):
@@ -25,7 +24,7 @@ class LabImageConfig(Model):
 class LabImage(Model):
     id: str
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     maxMemoryInMb: int
     maxCpus: float
     labImageConfig: LabImageConfig
@@ -41,7 +40,7 @@ class LabMountPoint(Model):
 class Lab(Model):
     id: str
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     labMountPoints: List[LabMountPoint]
 
 
@@ -1,27 +1,128 @@
 """An authentication mechanism that only needs a refresh token."""
 
+import os
+import json
+import time
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import threading
 
 import requests
 
 from coursera import ACCOUNT_ROOT
 
 
+# Process-wide token cache keyed by credentials, so multiple client
+# instances built from the same account share one access token instead of
+# each POSTing to the token endpoint.
+_TOKEN_CACHE = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
 class RefresherAuth(requests.auth.AuthBase):
     """Authenticate requests based on your client account creds and a refresh token."""
 
     def __init__(self, creds):
         self.creds = creds
         self.access_token = None
-        self.expires_at = 0
+        # The formatted "Bearer ..." header, rebuilt only when the token
+        # changes rather than on every request.
+        self._auth_header = None
+        # Monotonic deadline; wall-clock jumps can't invalidate (or
+        # falsely validate) the token.
+        self.expires_at = 0.0
+        # Refresh this many seconds before the real expiry so a token
+        # can't lapse while a request is in flight.
+        self.slack = 60.0
+        self._lock = threading.Lock()
+
+        # Persistent session for the token endpoint, so repeated refreshes
+        # reuse one connection instead of paying a TLS handshake each time.
+        self._token_session = requests.Session()
+        self._token_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=2))
+
+        # Pick up a still-valid token left behind by a previous process, so
+        # repeated CLI runs within the token lifetime skip the refresh POST.
+        self._load_cache()
+
+    def _cache_path(self):
+        """Where this account's token is persisted on disk."""
+        digest = hashlib.sha256(
+            "{}:{}".format(self.creds.client_id, self.creds.scopes).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(
+            os.path.expanduser("~/.cache/coursera_labs"),
+            "token-{}.json".format(digest[:16]),
+        )
+
+    def _load_cache(self):
+        """Adopt the on-disk token if it is still comfortably valid."""
+        try:
+            with open(self._cache_path()) as handle:
+                value = json.load(handle)
+
+            remaining = value["expires_at"] - time.time()
+            token = value["access_token"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # A missing, corrupt, or partially written cache file just means
+            # we refresh as if it weren't there.
+            return
+
+        if remaining > self.slack:
+            self.access_token = token
+            self._auth_header = "Bearer {}".format(token)
+            self.expires_at = time.monotonic() + remaining
+
+    def _save_cache(self, expires_in):
+        """Persist the current token atomically with owner-only permissions."""
+        path = self._cache_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w") as handle:
+                json.dump(
+                    {
+                        "access_token": self.access_token,
+                        "expires_at": time.time() + expires_in,
+                    },
+                    handle,
+                )
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, path)
+        except OSError:
+            logging.debug("Unable to persist the token cache to %s", path)
 
     def is_valid(self):
         """Do we have a valid access token?"""
-        return self.access_token and datetime.now() < self.expires_at
+        return self.access_token is not None and time.monotonic() + self.slack < self.expires_at
+
+    def invalidate(self):
+        """Drop the current token, locally and from the shared cache."""
+        key = (self.creds.client_id, self.creds.scopes, self.creds.refresh_token)
+
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE.pop(key, None)
+
+        try:
+            os.remove(self._cache_path())
+        except OSError:
+            pass
+
+        self.access_token = None
+        self._auth_header = None
+        self.expires_at = 0.0
 
     def refresh(self):
         """Fetch a fresh access token."""
+        key = (self.creds.client_id, self.creds.scopes, self.creds.refresh_token)
+
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(key)
+            if cached and time.monotonic() + self.slack < cached[1]:
+                self.access_token, self.expires_at = cached
+                self._auth_header = "Bearer {}".format(self.access_token)
+                return True
+
         data = {
             "refresh_token": self.creds.refresh_token,
             "grant_type": "refresh_token",
@@ -30,7 +131,7 @@ class RefresherAuth(requests.auth.AuthBase):
             "redirect_uri": "http://localhost:9876/callback",
         }
         logging.debug("[POST] %s ? %s", ACCOUNT_ROOT + "/token", data)
-        resp = requests.post(ACCOUNT_ROOT + "/token", data=data)
+        resp = self._token_session.post(ACCOUNT_ROOT + "/token", data=data, timeout=10)
         if resp.status_code != 200:
             raise RuntimeError(
                 "Unable to get a access token based on the supplied refresh token: [{}] {}".format(
@@ -40,14 +141,23 @@ class RefresherAuth(requests.auth.AuthBase):
 
         value = resp.json()
         self.access_token = value["access_token"]
-        self.expires_at = datetime.now() + timedelta(seconds=value["expires_in"])
+        self._auth_header = "Bearer {}".format(self.access_token)
+        self.expires_at = time.monotonic() + value["expires_in"]
+
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = (self.access_token, self.expires_at)
+
+        self._save_cache(value["expires_in"])
         return True
 
     def __call__(self, request):
         if not self.is_valid():
-            self.refresh()
+            # Double-checked so concurrent callers trigger a single refresh.
+            with self._lock:
+                if not self.is_valid():
+                    self.refresh()
 
-        request.headers["Authorization"] = "Bearer {}".format(self.access_token)
+        request.headers["Authorization"] = self._auth_header
         return request
 
     def __repr__(self):
@@ -1,14 +1,14 @@
 """Test script"""
 
 import logging
-from coursera import Coursera
+from coursera import get_client
 import sys
 
 
 def main():
     """main"""
     logging.basicConfig(level=logging.DEBUG)
-    client = Coursera()
+    client = get_client()
     print(client.whoami())
 
     # client.get_course("siads505")
@@ -16,20 +16,24 @@ def main():
     # course_id = "TAoqsmUpEemZsgqSEQNWtg"
     images = client.get_images(course_id)
 
-    for image in images:
+    # Fetch the labs for every image, and then the items for every lab,
+    # concurrently instead of one blocking round-trip at a time.
+    try:
+        labs_per_image = client.get_labs_bulk(course_id, [image.id for image in images])
+    except RuntimeError:
+        print("Unable to properly fetch labs.")
+        return
+
+    for image, labs in zip(images, labs_per_image):
         print("Image: {}".format(image.name))
 
-        try:
-            labs = client.get_labs(course_id, image.id)
-        except RuntimeError:
-            print("  Unable to properly fetch labs.")
-            continue
+        item_lists = client.get_lab_items_bulk(
+            (course_id, image.id, lab.id) for lab in labs
+        )
 
-        for lab in labs:
+        for lab, items in zip(labs, item_lists):
             print("  Lab: {}".format(lab.name))
 
-            items = client.get_lab_items(course_id, image.id, lab.id)
-
             for item in items:
                 print("    Item: {}".format(item))
 